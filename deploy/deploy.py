@@ -1,9 +1,45 @@
+import gzip
+import hashlib
 import json
 import boto3
 import os
-import zipfile
-import tempfile
-from urllib.request import urlopen
+import urllib3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+# HTML must be revalidated so a redeploy is picked up immediately; CSS/JS
+# names carry a content hash, so browsers and CloudFront can keep them
+_CACHE_CONTROL = {
+    'html': 'no-cache, no-store, must-revalidate',
+    'css': 'public, max-age=31536000, immutable',
+    'js': 'public, max-age=31536000, immutable'
+}
+_DEFAULT_CACHE_CONTROL = 'max-age=300'  # 5 minutes cache
+
+# Assets renamed to include a content hash on deploy
+_FINGERPRINTED_EXTENSIONS = ('css', 'js')
+
+# Upper bound on concurrent uploads; the S3 client keeps one pooled
+# connection per upload thread
+_MAX_UPLOAD_WORKERS = 8
+_S3_CONFIG = Config(max_pool_connections=_MAX_UPLOAD_WORKERS, tcp_keepalive=True)
+
+# Clients are created once per container so warm invocations reuse their
+# connection pools instead of repeating TLS handshakes
+try:
+    _S3 = boto3.client('s3', config=_S3_CONFIG)
+except Exception:
+    # No region configured (e.g. importing outside Lambda); create on demand
+    _S3 = None
+# The CloudFormation callback retries briefly and fails fast rather than
+# hanging the function until its timeout
+_HTTP = urllib3.PoolManager(
+    maxsize=2,
+    retries=Retry(total=3, backoff_factor=0.2),
+    timeout=urllib3.Timeout(connect=2.0, read=5.0)
+)
 
 def lambda_handler(event, context):
     """
@@ -14,33 +50,25 @@ def lambda_handler(event, context):
         bucket_name = os.environ['BUCKET_NAME']
         api_endpoint = os.environ['API_ENDPOINT']
         
-        s3 = boto3.client('s3')
+        s3 = _S3 or boto3.client('s3', config=_S3_CONFIG)
         
-        # Web files content
-        web_files = {
-            'index.html': get_index_html(api_endpoint),
-            'style.css': get_style_css(),
-            'script.js': get_script_js(api_endpoint),
-            'error.html': get_error_html()
-        }
+        # Web files as (filename, content type, content); only templates
+        # need the API endpoint substituted
+        web_files = [
+            (filename, content_type,
+             template.format(api_endpoint=api_endpoint) if '{api_endpoint}' in template else template)
+            for filename, content_type, template in _DEPLOY_SPEC
+        ]
+        web_files = fingerprint_assets(web_files)
         
-        # Upload files to S3
-        for filename, content in web_files.items():
-            content_type = get_content_type(filename)
-            
-            s3.put_object(
-                Bucket=bucket_name,
-                Key=filename,
-                Body=content,
-                ContentType=content_type,
-                CacheControl='max-age=300'  # 5 minutes cache
-            )
+        uploaded = upload_files(s3, bucket_name, web_files)
         
         # Send success response to CloudFormation
         send_response(event, context, 'SUCCESS', {
             'Message': f'Web files deployed to {bucket_name}',
             'BucketName': bucket_name,
-            'FilesDeployed': list(web_files.keys())
+            'FilesDeployed': [filename for filename, _, _ in web_files],
+            'FilesUploaded': uploaded
         })
         
     except Exception as e:
@@ -49,20 +77,87 @@ def lambda_handler(event, context):
             'Message': f'Failed to deploy web files: {str(e)}'
         })
 
-def get_content_type(filename):
-    """Get content type based on file extension"""
-    if filename.endswith('.html'):
-        return 'text/html'
-    elif filename.endswith('.css'):
-        return 'text/css'
-    elif filename.endswith('.js'):
-        return 'application/javascript'
-    else:
-        return 'text/plain'
-
-def get_index_html(api_endpoint):
-    """Generate index.html with correct API endpoint"""
-    return f'''<!DOCTYPE html>
+def upload_files(s3, bucket_name, web_files):
+    """Upload gzip-compressed web files, skipping unchanged ones"""
+    
+    def upload_file(item):
+        filename, content_type, content = item
+        body = compress_body(content)
+        metadata = {
+            'ContentType': content_type,
+            'ContentEncoding': 'gzip',
+            'CacheControl': get_cache_control(filename)
+        }
+        
+        # Skip the PUT when S3 already holds identical content - the
+        # custom resource is re-invoked on every stack update
+        if is_unchanged(s3, bucket_name, filename, body, metadata):
+            return False
+        
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=filename,
+            Body=body,
+            **metadata
+        )
+        return True
+    
+    # Upload files to S3 in parallel - each HEAD/PUT is an independent,
+    # latency-bound round trip, and boto3 clients are thread-safe
+    with ThreadPoolExecutor(max_workers=min(len(web_files), _MAX_UPLOAD_WORKERS)) as executor:
+        # list() drains the iterator so any upload error is raised here
+        changed = list(executor.map(upload_file, web_files))
+    
+    return [filename for (filename, _, _), was_uploaded in zip(web_files, changed) if was_uploaded]
+
+def fingerprint_assets(web_files):
+    """
+    Rename CSS/JS files to include a hash of their content (style.css ->
+    style.<hash>.css) and point the HTML files at the new names
+    """
+    renamed = {}
+    for filename, _, content in web_files:
+        stem, ext = filename.rsplit('.', 1)
+        if ext in _FINGERPRINTED_EXTENSIONS:
+            content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:8]
+            renamed[filename] = f'{stem}.{content_hash}.{ext}'
+    
+    fingerprinted = []
+    for filename, content_type, content in web_files:
+        if content_type == 'text/html':
+            for old_name, new_name in renamed.items():
+                content = content.replace(f'"{old_name}"', f'"{new_name}"')
+        fingerprinted.append((renamed.get(filename, filename), content_type, content))
+    return fingerprinted
+
+def get_cache_control(filename):
+    """Get Cache-Control header based on file extension"""
+    return _CACHE_CONTROL.get(filename.rsplit('.', 1)[-1], _DEFAULT_CACHE_CONTROL)
+
+def compress_body(content):
+    """Gzip-compress a text body for upload with Content-Encoding: gzip"""
+    # mtime=0 keeps the output deterministic so unchanged files keep their ETag
+    return gzip.compress(content.encode('utf-8'), compresslevel=6, mtime=0)
+
+def is_unchanged(s3, bucket_name, key, body, metadata):
+    """Check whether the object in S3 already matches body and metadata"""
+    try:
+        head = s3.head_object(Bucket=bucket_name, Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    
+    # The ETag of a single-part upload is the MD5 of the stored bytes
+    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+    if head.get('ETag') != etag:
+        return False
+    return all(head.get(name) == value for name, value in metadata.items())
+
+# Web file bodies are built once at import time; only the API endpoint is
+# substituted per invocation. Templates use str.format placeholders, so
+# literal braces are doubled.
+_INDEX_TMPL = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -203,10 +298,8 @@ def get_index_html(api_endpoint):
 </body>
 </html>'''
 
-def get_style_css():
-    """Return CSS content"""
-    # This would contain the full CSS - truncated for brevity
-    return '''/* EME Dish Calculator Styles - Production Version */
+# This would contain the full CSS - truncated for brevity
+_STYLE_CSS = '''/* EME Dish Calculator Styles - Production Version */
 :root {
     --primary-color: #2c3e50;
     --secondary-color: #3498db;
@@ -241,9 +334,7 @@ body {
 /* Add all other CSS styles here - truncated for brevity */
 '''
 
-def get_script_js(api_endpoint):
-    """Return JavaScript content with correct API endpoint"""
-    return f'''// EME Dish Calculator JavaScript - Production Version
+_SCRIPT_TMPL = '''// EME Dish Calculator JavaScript - Production Version
 
 const API_ENDPOINT = '{api_endpoint}/calculate';
 
@@ -272,9 +363,7 @@ async function handleFormSubmit(event) {{
 // Add all other JavaScript functions here - truncated for brevity
 '''
 
-def get_error_html():
-    """Return error page HTML"""
-    return '''<!DOCTYPE html>
+_ERROR_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -292,10 +381,16 @@ def get_error_html():
 </body>
 </html>'''
 
+# Files deployed to the bucket as (filename, content type, body template)
+_DEPLOY_SPEC = (
+    ('index.html', 'text/html', _INDEX_TMPL),
+    ('style.css', 'text/css', _STYLE_CSS),
+    ('script.js', 'application/javascript', _SCRIPT_TMPL),
+    ('error.html', 'text/html', _ERROR_HTML)
+)
+
 def send_response(event, context, response_status, response_data):
     """Send response to CloudFormation"""
-    import urllib3
-    
     response_url = event['ResponseURL']
     
     response_body = {
@@ -308,15 +403,16 @@ def send_response(event, context, response_status, response_data):
         'Data': response_data
     }
     
-    json_response_body = json.dumps(response_body)
+    # Encode once; Content-Length must count bytes, not characters
+    payload = json.dumps(response_body).encode('utf-8')
     
     headers = {
         'content-type': '',
-        'content-length': str(len(json_response_body))
+        'content-length': str(len(payload))
     }
     
-    http = urllib3.PoolManager()
-    response = http.request('PUT', response_url, body=json_response_body, headers=headers)
+    response = _HTTP.request('PUT', response_url, body=payload, headers=headers)
     
-    print(f"Status code: {response.status}")
+    if response.status != 200 or os.environ.get('DEBUG'):
+        print(f"Status code: {response.status}")
     return response
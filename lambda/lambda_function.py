@@ -1,7 +1,39 @@
 import json
 import os
+import re
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+
+try:
+    import orjson
+    
+    # Results are built from JSON-native values; datetimes and NumPy values
+    # are encoded natively instead of through a default= callback
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+    
+    def json_loads(data):
+        return orjson.loads(data)
+    
+    def json_dumps(obj):
+        # API Gateway proxy responses expect a str body
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+except ImportError:
+    # Fall back to the standard library when orjson isn't installed
+    json_loads = json.loads
+    
+    def _json_default(obj):
+        """Encode datetimes and NumPy values the way orjson does"""
+        if isinstance(obj, datetime):
+            if obj.tzinfo is None:
+                obj = obj.replace(tzinfo=timezone.utc)
+            return obj.isoformat()
+        if hasattr(obj, 'tolist'):
+            return obj.tolist()
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+    
+    def json_dumps(obj):
+        return json.dumps(obj, default=_json_default)
 
 # Add the src directory to the path so we can import our calculator
 sys.path.append('/opt/python')
@@ -13,72 +45,126 @@ except ImportError:
     sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
     from eme_calculator import EMECalculator
 
+# Maidenhead locator: field (A-R), square (0-9), subsquare (A-X), then
+# optional extended square (0-9) and extended subsquare (A-X)
+_GRID_RE = re.compile(r'[A-R]{2}[0-9]{2}[A-X]{2}(?:[0-9]{2}(?:[A-X]{2})?)?', re.ASCII | re.IGNORECASE)
+
+# Request parameters as (field, type, default); a default of None marks
+# the field as required
+_PARAMETER_SCHEMA = (
+    ('grid_square', str, None),
+    ('frequency_mhz', int, None),
+    ('dish_diameter_m', float, None),
+    ('max_wind_mph', float, None),
+    ('elevation_m', float, 0.0),
+    ('tree_height_ft', float, 0.0),
+    ('tree_distance_ft', float, 100.0)
+)
+_REQUIRED_FIELDS = [field for field, _, default in _PARAMETER_SCHEMA if default is None]
+
+# Enable CORS
+_CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'OPTIONS,POST,GET'
+}
+
+# The preflight response is identical for every request
+_CORS_PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': _CORS_HEADERS,
+    'body': json_dumps({'message': 'CORS preflight'})
+}
+
+# Calculator is reused across warm invocations
+_CALC = EMECalculator()
+
+@lru_cache(maxsize=256)
+def get_moonrise_windows(lat, lon, elevation_m, start_date):
+    """
+    Moonrise windows for a location, cached across warm invocations.
+    Callers quantize lat/lon to 0.01° (~1 km) and elevation to 1 m so
+    nearby requests share an entry.
+    """
+    _CALC.setup_observer(lat, lon, elevation_m)
+    # Limit to 90 days for performance
+    return _CALC.calculate_moonrise_windows(start_date, days=90)
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler for EME dish calculator API
     """
     
-    # Enable CORS
-    headers = {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type',
-        'Access-Control-Allow-Methods': 'OPTIONS,POST,GET'
-    }
+    headers = _CORS_HEADERS
     
     try:
         # Handle preflight OPTIONS request
         if event.get('httpMethod') == 'OPTIONS':
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({'message': 'CORS preflight'})
-            }
+            return _CORS_PREFLIGHT_RESPONSE
         
-        # Parse request body
-        if 'body' in event:
-            if isinstance(event['body'], str):
-                body = json.loads(event['body'])
-            else:
-                body = event['body']
-        else:
-            body = event
+        # Parse request body - API Gateway delivers str (or bytes), direct
+        # invocations may pass a dict body or the parameters themselves
+        raw_body = event.get('body', event)
+        body = raw_body if isinstance(raw_body, dict) else json_loads(raw_body)
         
-        # Validate required fields
-        required_fields = ['grid_square', 'frequency_mhz', 'dish_diameter_m', 'max_wind_mph']
-        for field in required_fields:
-            if field not in body:
+        # Validate and coerce parameters in one pass over the schema
+        params = {}
+        for field, cast, default in _PARAMETER_SCHEMA:
+            value = body.get(field)
+            if value is None:
+                value = default
+            if value is None:
                 return {
                     'statusCode': 400,
                     'headers': headers,
-                    'body': json.dumps({
+                    'body': json_dumps({
                         'error': f'Missing required field: {field}',
-                        'required_fields': required_fields
+                        'required_fields': _REQUIRED_FIELDS
+                    })
+                }
+            try:
+                params[field] = cast(value)
+            except (TypeError, ValueError):
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json_dumps({
+                        'error': f'Invalid value for {field}: expected {cast.__name__}'
                     })
                 }
         
-        # Extract parameters with defaults
-        grid_square = body['grid_square'].upper()
-        frequency_mhz = int(body['frequency_mhz'])
-        dish_diameter_m = float(body['dish_diameter_m'])
-        max_wind_mph = float(body['max_wind_mph'])
-        elevation_m = float(body.get('elevation_m', 0))
-        tree_height_ft = float(body.get('tree_height_ft', 0))
-        tree_distance_ft = float(body.get('tree_distance_ft', 100))
+        grid_square = params['grid_square'].upper()
+        frequency_mhz = params['frequency_mhz']
+        dish_diameter_m = params['dish_diameter_m']
+        max_wind_mph = params['max_wind_mph']
+        elevation_m = params['elevation_m']
+        tree_height_ft = params['tree_height_ft']
+        tree_distance_ft = params['tree_distance_ft']
         target_regions = body.get('target_regions', ['Europe', 'Caribbean', 'South America', 'Africa'])
         
+        # Regions become keys of the response, which must be strings
+        if target_regions is not None and not (
+                isinstance(target_regions, list) and all(isinstance(region, str) for region in target_regions)):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json_dumps({
+                    'error': 'Invalid value for target_regions: expected list of str'
+                })
+            }
+        
         # Validate grid square format
         if not validate_grid_square(grid_square):
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({
+                'body': json_dumps({
                     'error': 'Invalid grid square format. Expected format: AB12cd (6), AB12cd34 (8), or AB12cd34ef (10) characters'
                 })
             }
         
-        # Initialize calculator
-        calc = EMECalculator()
+        calc = _CALC  # Shared calculator instance
         
         # Setup location
         try:
@@ -87,16 +173,17 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({
+                'body': json_dumps({
                     'error': f'Invalid grid square: {str(e)}'
                 })
             }
         
-        calc.setup_observer(lat, lon, elevation_m)
-        
-        # Calculate moonrise windows (limit to 90 days for performance)
-        start_date = datetime.now().replace(day=1)
-        windows = calc.calculate_moonrise_windows(start_date, days=90)
+        # Calculate moonrise windows from UTC midnight on the first of the
+        # month, so every request in a month shares the same inputs
+        start_date = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        windows = get_moonrise_windows(
+            round(lat, 2), round(lon, 2), round(elevation_m), start_date
+        )
         
         # Analyze opportunities
         opportunities = calc.analyze_eme_opportunities(windows, target_regions)
@@ -116,8 +203,8 @@ def lambda_handler(event, context):
             },
             'eme_opportunities': {
                 region: {
-                    'annual_passes': len(ops) * 4,  # Scale 90-day sample to annual
-                    'avg_hours_after_moonrise': sum(op['hours_after_rise'] for op in ops) / len(ops) if ops else 0
+                    'annual_passes': ops.hours_after_rise.size * 4,  # Scale 90-day sample to annual
+                    'avg_hours_after_moonrise': float(ops.hours_after_rise.mean()) if ops.hours_after_rise.size else 0
                 }
                 for region, ops in opportunities.items()
             },
@@ -132,7 +219,7 @@ def lambda_handler(event, context):
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(results, default=str)
+            'body': json_dumps(results)
         }
         
     except Exception as e:
@@ -140,7 +227,7 @@ def lambda_handler(event, context):
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({
+            'body': json_dumps({
                 'error': 'Internal server error',
                 'message': str(e)
             })
@@ -148,36 +235,7 @@ def lambda_handler(event, context):
 
 def validate_grid_square(grid):
     """Validate Maidenhead grid square format"""
-    if len(grid) < 6 or len(grid) > 10 or len(grid) % 2 != 0:
-        return False
-    
-    # First two characters: A-R
-    if not (grid[0].isalpha() and grid[1].isalpha() and 
-            'A' <= grid[0] <= 'R' and 'A' <= grid[1] <= 'R'):
-        return False
-    
-    # Next two characters: 0-9
-    if not (grid[2].isdigit() and grid[3].isdigit()):
-        return False
-    
-    # Next two characters (if present): A-X
-    if len(grid) >= 6:
-        if not (grid[4].isalpha() and grid[5].isalpha() and
-                'A' <= grid[4].upper() <= 'X' and 'A' <= grid[5].upper() <= 'X'):
-            return False
-    
-    # Next two characters (if present): 0-9
-    if len(grid) >= 8:
-        if not (grid[6].isdigit() and grid[7].isdigit()):
-            return False
-    
-    # Last two characters (if present): A-X
-    if len(grid) == 10:
-        if not (grid[8].isalpha() and grid[9].isalpha() and
-                'A' <= grid[8].upper() <= 'X' and 'A' <= grid[9].upper() <= 'X'):
-            return False
-    
-    return True
+    return _GRID_RE.fullmatch(grid) is not None
 
 # For local testing
 if __name__ == "__main__":
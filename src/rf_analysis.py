@@ -4,8 +4,42 @@ RF Analysis Module for EME Dish Calculator
 Advanced frequency-specific calculations and considerations
 """
 
+import bisect
 import math
+from functools import lru_cache
 from typing import Dict, Tuple
+import numpy as np
+
+# EME path length (~770,000 km round trip)
+EME_DISTANCE_KM = 770000
+
+# Typical SSB bandwidth used for the noise floor
+NOISE_BANDWIDTH_HZ = 2500
+
+# Math functions bound once for the scalar hot paths, which would
+# otherwise look each one up on the math module per call
+_log10 = math.log10
+_atan = math.atan
+_sin = math.sin
+_sqrt = math.sqrt
+_degrees = math.degrees
+_PI = math.pi
+
+# Spreading loss over the EME path, added to each band's free-space loss
+_EME_DISTANCE_LOSS_DB = 20 * _log10(EME_DISTANCE_KM)
+
+# Simplified ITU-R P.838 rain model: exponent alpha and effective path
+# length through rain (5 km average)
+RAIN_ALPHA = 1.0
+RAIN_PATH_KM = 5
+
+def _dish_gain_db(dish_diameter_wavelengths: np.ndarray) -> np.ndarray:
+    """Parabolic dish gain at 60% efficiency, for arrays of dish sizes"""
+    return 10 * np.log10(0.6 * (np.pi * dish_diameter_wavelengths) ** 2)
+
+def _band_column(bands: Dict, key: str) -> np.ndarray:
+    """One band attribute as an array, ordered by frequency"""
+    return np.array([bands[freq][key] for freq in sorted(bands)], dtype=np.float64)
 
 class RFAnalyzer:
     """Advanced RF analysis for EME operations"""
@@ -113,6 +147,34 @@ class RFAnalyzer:
         }
     }
     
+    # Band attributes as parallel arrays (ordered by frequency) for
+    # vectorized sweeps over many frequencies and dish sizes
+    _SORTED_BAND_FREQS = tuple(sorted(BAND_CHARACTERISTICS))
+    _FREQS = np.array(_SORTED_BAND_FREQS, dtype=np.float64)
+    _WAVELENGTH_M = _band_column(BAND_CHARACTERISTICS, "wavelength_cm") / 100
+    _TREE_ATTENUATION = _band_column(BAND_CHARACTERISTICS, "tree_attenuation_db_per_m")
+    _RAIN_COEFFICIENT = _band_column(BAND_CHARACTERISTICS, "rain_rate_coefficient")
+    _NOISE_K = _band_column(BAND_CHARACTERISTICS, "atmospheric_noise_k")
+    _MIN_ELEVATION = _band_column(BAND_CHARACTERISTICS, "min_elevation_deg")
+    _DOPPLER = _band_column(BAND_CHARACTERISTICS, "doppler_shift_hz_per_ms")
+    _PATH_LOSS_FS = _band_column(BAND_CHARACTERISTICS, "path_loss_free_space_db")
+    
+    # Dish-independent per-band terms, computed once
+    _EME_PATH_LOSS_DB = {
+        freq: band["path_loss_free_space_db"] + _EME_DISTANCE_LOSS_DB
+        for freq, band in BAND_CHARACTERISTICS.items()
+    }
+    _NOISE_FLOOR_DBW = {
+        freq: 10 * math.log10(1.38e-23 * (band["atmospheric_noise_k"] + 50) * NOISE_BANDWIDTH_HZ)
+        for freq, band in BAND_CHARACTERISTICS.items()
+    }
+    
+    # Rain fade (dB) per band at whole rain rates of 0-100 mm/hr; rates in
+    # between are interpolated linearly, rates outside use the formula
+    _RAIN_RATES = np.arange(0, 101, 1.0)
+    _RAIN_FADE_TABLE = _RAIN_COEFFICIENT[:, None] * _RAIN_RATES ** RAIN_ALPHA * RAIN_PATH_KM
+    _RAIN_FADE_ROWS = dict(zip(_SORTED_BAND_FREQS, _RAIN_FADE_TABLE.tolist()))
+    
     def __init__(self):
         pass
     
@@ -122,34 +184,39 @@ class RFAnalyzer:
                              tree_distance_ft: float = 100,
                              rain_rate_mm_hr: float = 5) -> Dict:
         """Comprehensive frequency band analysis"""
-        
-        if frequency_mhz not in self.BAND_CHARACTERISTICS:
-            raise ValueError(f"Unsupported frequency: {frequency_mhz} MHz")
-        
-        band = self.BAND_CHARACTERISTICS[frequency_mhz]
+        # Results depend only on the arguments, so they are cached; return a
+        # copy so callers can't modify the cached entry
+        return dict(self._analyze_frequency_band(
+            frequency_mhz, dish_diameter_m, tree_height_ft, tree_distance_ft, rain_rate_mm_hr
+        ))
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _analyze_frequency_band(cls, frequency_mhz: int, dish_diameter_m: float,
+                                tree_height_ft: float, tree_distance_ft: float,
+                                rain_rate_mm_hr: float) -> Dict:
+        band = cls._band(frequency_mhz)
         
         # Basic calculations
         wavelength_m = band["wavelength_cm"] / 100
         dish_diameter_wavelengths = dish_diameter_m / wavelength_m
         
         # Antenna gain calculation (parabolic dish)
-        efficiency = 0.6  # Typical dish efficiency
-        gain_db = 10 * math.log10(efficiency * (math.pi * dish_diameter_m / wavelength_m) ** 2)
+        gain_db = cls._antenna_gain_db(wavelength_m, dish_diameter_m)
         
         # Beamwidth calculation
         beamwidth_deg = 70 * wavelength_m / dish_diameter_m
         
         # Tree loss calculation
-        tree_loss_db = self.calculate_tree_loss(
+        tree_loss_db = cls.calculate_tree_loss(
             frequency_mhz, tree_height_ft, tree_distance_ft
         )
         
         # Rain fade calculation
-        rain_fade_db = self.calculate_rain_fade(frequency_mhz, rain_rate_mm_hr)
+        rain_fade_db = cls.calculate_rain_fade(frequency_mhz, rain_rate_mm_hr)
         
         # Path loss (EME distance ~770,000 km round trip)
-        eme_distance_km = 770000
-        path_loss_db = band["path_loss_free_space_db"] + 20 * math.log10(eme_distance_km)
+        path_loss_db = cls._eme_path_loss_db(frequency_mhz)
         
         # System noise temperature
         system_noise_k = band["atmospheric_noise_k"] + 50  # Add receiver noise
@@ -172,12 +239,196 @@ class RFAnalyzer:
             "max_doppler_hz": max_doppler_hz,
             "min_elevation_deg": band["min_elevation_deg"],
             "typical_dish_sizes": band["typical_dish_sizes"],
-            "suitability_score": self.calculate_suitability_score(
+            "suitability_score": cls.calculate_suitability_score(
                 frequency_mhz, dish_diameter_m, tree_loss_db
             )
         }
     
-    def calculate_tree_loss(self, frequency_mhz: int, 
+    def analyze_many(self, frequencies_mhz, dish_diameters_m,
+                     tree_height_ft=0, tree_distance_ft=100,
+                     rain_rate_mm_hr=5) -> Dict[str, np.ndarray]:
+        """
+        Vectorized analyze_frequency_band over many frequency/dish
+        combinations. Inputs broadcast against each other; returns a
+        dict of arrays with the broadcast shape.
+        """
+        freqs, diameters, tree_h_ft, tree_d_ft, rain = np.broadcast_arrays(
+            np.asarray(frequencies_mhz, dtype=np.float64),
+            np.asarray(dish_diameters_m, dtype=np.float64),
+            np.asarray(tree_height_ft, dtype=np.float64),
+            np.asarray(tree_distance_ft, dtype=np.float64),
+            np.asarray(rain_rate_mm_hr, dtype=np.float64)
+        )
+        
+        idx = self._band_indices(freqs)
+        wavelength_m, path_loss_fs_db = self._propagation_columns(freqs, idx)
+        min_elevation_deg = self._MIN_ELEVATION[idx]
+        dish_diameter_wavelengths = diameters / wavelength_m
+        
+        # Antenna gain and beamwidth (parabolic dish, 60% efficiency)
+        gain_db = _dish_gain_db(dish_diameter_wavelengths)
+        beamwidth_deg = 70 * wavelength_m / diameters
+        
+        # Tree loss: path through vegetation when trees rise above the
+        # band's minimum elevation
+        has_trees = (tree_h_ft > 0) & (tree_d_ft > 0)
+        tree_h_m = tree_h_ft * 0.3048
+        tree_d_m = np.where(has_trees, tree_d_ft * 0.3048, 1.0)
+        clearance_rad = np.arctan(tree_h_m / tree_d_m)
+        blocked = has_trees & (np.degrees(clearance_rad) > min_elevation_deg)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            path_through_trees_m = tree_h_m / np.sin(clearance_rad)
+        tree_loss_db = np.where(
+            blocked, np.minimum(self._TREE_ATTENUATION[idx] * path_through_trees_m, 40), 0.0
+        )
+        
+        # Rain fade over the effective rain path
+        rain_fade_db = self._RAIN_COEFFICIENT[idx] * rain ** RAIN_ALPHA * RAIN_PATH_KM
+        
+        # Path loss (EME distance ~770,000 km round trip)
+        path_loss_db = path_loss_fs_db + _EME_DISTANCE_LOSS_DB
+        
+        # Suitability score, mirroring calculate_suitability_score
+        score = np.full(freqs.shape, 100.0)
+        score -= np.select([dish_diameter_wavelengths < 10, dish_diameter_wavelengths < 20], [30, 15], 0)
+        score -= np.select([tree_loss_db > 20, tree_loss_db > 10, tree_loss_db > 5], [40, 20, 10], 0)
+        score += np.select([freqs >= 3456, freqs <= 432], [-10, 10], 0)
+        
+        return {
+            "frequency_mhz": freqs,
+            "wavelength_m": wavelength_m,
+            "dish_diameter_wavelengths": dish_diameter_wavelengths,
+            "antenna_gain_db": gain_db,
+            "beamwidth_deg": beamwidth_deg,
+            "tree_loss_db": tree_loss_db,
+            "rain_fade_db": rain_fade_db,
+            "path_loss_db": path_loss_db,
+            "system_noise_k": self._NOISE_K[idx] + 50,  # Add receiver noise
+            "max_doppler_hz": self._DOPPLER[idx] * 1000,
+            "min_elevation_deg": min_elevation_deg,
+            "suitability_score": np.clip(score, 0, 100)
+        }
+    
+    def calculate_link_budget_many(self, frequencies_mhz, dish_diameters_m,
+                                   tx_power_w=100, elevation_deg=15) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_link_budget over many frequency/dish/power/
+        elevation combinations. Inputs broadcast against each other;
+        returns a dict of arrays with the broadcast shape.
+        """
+        freqs, diameters, tx_power_w, elevation_deg = np.broadcast_arrays(
+            np.asarray(frequencies_mhz, dtype=np.float64),
+            np.asarray(dish_diameters_m, dtype=np.float64),
+            np.asarray(tx_power_w, dtype=np.float64),
+            np.asarray(elevation_deg, dtype=np.float64)
+        )
+        idx = self._band_indices(freqs)
+        wavelength_m, path_loss_fs_db = self._propagation_columns(freqs, idx)
+        
+        tx_power_dbw = 10 * np.log10(tx_power_w)
+        gain_db = _dish_gain_db(diameters / wavelength_m)
+        path_loss_db = path_loss_fs_db + _EME_DISTANCE_LOSS_DB
+        misc_losses_db = 3  # Feedline, mismatch, etc.
+        elevation_loss_db = np.where(elevation_deg < 10, (10 - elevation_deg) * 0.5, 0.0)
+        
+        rx_signal_dbw = (tx_power_dbw + 2 * gain_db -
+                         path_loss_db - misc_losses_db - elevation_loss_db)
+        noise_floor_dbw = 10 * np.log10(1.38e-23 * (self._NOISE_K[idx] + 50) * NOISE_BANDWIDTH_HZ)
+        snr_db = rx_signal_dbw - noise_floor_dbw
+        
+        return {
+            "frequency_mhz": freqs,
+            "tx_power_dbw": tx_power_dbw,
+            "tx_gain_db": gain_db,
+            "rx_gain_db": gain_db,
+            "path_loss_db": path_loss_db,
+            "misc_losses_db": misc_losses_db,
+            "elevation_loss_db": elevation_loss_db,
+            "rx_signal_dbw": rx_signal_dbw,
+            "noise_floor_dbw": noise_floor_dbw,
+            "snr_db": snr_db,
+            "link_margin_db": snr_db - 10,  # 10 dB required for reliable copy
+            "feasible": snr_db > 10
+        }
+    
+    @classmethod
+    def _band_indices(cls, freqs: np.ndarray) -> np.ndarray:
+        """
+        Indices into the band arrays of the nearest band to each frequency
+        (ties go to the lower band)
+        """
+        if (freqs <= 0).any():
+            raise ValueError(f"Unsupported frequency: {freqs[freqs <= 0].flat[0]:g} MHz")
+        upper = np.minimum(np.searchsorted(cls._FREQS, freqs), cls._FREQS.size - 1)
+        lower = np.maximum(upper - 1, 0)
+        use_lower = np.abs(freqs - cls._FREQS[lower]) <= np.abs(cls._FREQS[upper] - freqs)
+        return np.where(use_lower, lower, upper)
+    
+    @classmethod
+    def _propagation_columns(cls, freqs: np.ndarray,
+                             idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Wavelength (m) and free-space path loss (dB) for each frequency:
+        the band table values on band, derived from the frequency itself
+        between bands
+        """
+        on_band = cls._FREQS[idx] == freqs
+        wavelength_m = np.where(on_band, cls._WAVELENGTH_M[idx], 299.792458 / freqs)
+        path_loss_fs_db = np.where(on_band, cls._PATH_LOSS_FS[idx], 32.4 + 20 * np.log10(freqs))
+        return wavelength_m, path_loss_fs_db
+    
+    @classmethod
+    def _band(cls, frequency_mhz: float) -> Dict:
+        """
+        Characteristics for a band. Frequencies between bands use the
+        nearest band (ties go to the lower band), with wavelength and
+        free-space path loss derived from the frequency itself.
+        """
+        band = cls.BAND_CHARACTERISTICS.get(frequency_mhz)
+        if band is None:
+            band = cls._off_band(frequency_mhz)
+        return band
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _off_band(cls, frequency_mhz: float) -> Dict:
+        """Characteristics derived from the nearest band, for frequencies between bands"""
+        if frequency_mhz <= 0:
+            raise ValueError(f"Unsupported frequency: {frequency_mhz} MHz")
+        
+        freqs = cls._SORTED_BAND_FREQS
+        i = bisect.bisect_left(freqs, frequency_mhz)
+        candidates = freqs[max(0, i - 1):i + 1]
+        nearest = min(candidates, key=lambda x: abs(x - frequency_mhz))
+        
+        band = dict(cls.BAND_CHARACTERISTICS[nearest])
+        band["wavelength_cm"] = 29979.2458 / frequency_mhz  # c/f
+        band["path_loss_free_space_db"] = 32.4 + 20 * _log10(frequency_mhz)
+        return band
+    
+    @classmethod
+    def _eme_path_loss_db(cls, frequency_mhz: float) -> float:
+        """Round-trip EME path loss"""
+        if frequency_mhz in cls._EME_PATH_LOSS_DB:
+            return cls._EME_PATH_LOSS_DB[frequency_mhz]
+        return cls._band(frequency_mhz)["path_loss_free_space_db"] + _EME_DISTANCE_LOSS_DB
+    
+    @classmethod
+    def _noise_floor_dbw(cls, frequency_mhz: float) -> float:
+        """Noise floor over the SSB bandwidth, with 50 K receiver noise"""
+        if frequency_mhz in cls._NOISE_FLOOR_DBW:
+            return cls._NOISE_FLOOR_DBW[frequency_mhz]
+        band = cls._band(frequency_mhz)
+        return 10 * _log10(1.38e-23 * (band["atmospheric_noise_k"] + 50) * NOISE_BANDWIDTH_HZ)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _antenna_gain_db(wavelength_m: float, dish_diameter_m: float) -> float:
+        """Parabolic dish gain at 60% efficiency"""
+        return 10 * _log10(0.6 * (_PI * dish_diameter_m / wavelength_m) ** 2)
+    
+    @classmethod
+    def calculate_tree_loss(cls, frequency_mhz: int, 
                           tree_height_ft: float, 
                           tree_distance_ft: float) -> float:
         """Calculate RF loss through vegetation"""
@@ -185,49 +436,53 @@ class RFAnalyzer:
         if tree_height_ft <= 0 or tree_distance_ft <= 0:
             return 0
         
-        band = self.BAND_CHARACTERISTICS[frequency_mhz]
+        band = cls._band(frequency_mhz)
         
         # Convert to meters
         tree_height_m = tree_height_ft * 0.3048
         tree_distance_m = tree_distance_ft * 0.3048
         
         # Calculate elevation angle to clear trees
-        clearance_angle_rad = math.atan(tree_height_m / tree_distance_m)
-        clearance_angle_deg = math.degrees(clearance_angle_rad)
+        clearance_angle_rad = _atan(tree_height_m / tree_distance_m)
+        clearance_angle_deg = _degrees(clearance_angle_rad)
         
         # If moon is below clearance angle, calculate path through vegetation
         # Simplified model: assume path through vegetation at grazing angle
         if clearance_angle_deg > band["min_elevation_deg"]:
             # Path length through vegetation (simplified)
-            path_through_trees_m = tree_height_m / math.sin(clearance_angle_rad)
+            path_through_trees_m = tree_height_m / _sin(clearance_angle_rad)
             loss_db = band["tree_attenuation_db_per_m"] * path_through_trees_m
             return min(loss_db, 40)  # Cap at 40 dB
         
         return 0
     
-    def calculate_rain_fade(self, frequency_mhz: int, rain_rate_mm_hr: float) -> float:
+    @classmethod
+    def calculate_rain_fade(cls, frequency_mhz: int, rain_rate_mm_hr: float) -> float:
         """Calculate rain fade using ITU-R model (simplified)"""
         
-        band = self.BAND_CHARACTERISTICS[frequency_mhz]
+        # Precomputed bands and rates: interpolate within the table
+        row = cls._RAIN_FADE_ROWS.get(frequency_mhz)
+        if row is not None and 0 <= rain_rate_mm_hr < len(row) - 1:
+            i = int(rain_rate_mm_hr)
+            return row[i] + (rain_rate_mm_hr - i) * (row[i + 1] - row[i])
+        
+        band = cls._band(frequency_mhz)
         
         # ITU-R P.838 coefficients (simplified)
         k = band["rain_rate_coefficient"]
-        alpha = 1.0  # Simplified
         
         # Rain fade in dB/km
-        fade_db_per_km = k * (rain_rate_mm_hr ** alpha)
-        
-        # Effective path length through rain (assume 5 km average)
-        effective_path_km = 5
+        fade_db_per_km = k * (rain_rate_mm_hr ** RAIN_ALPHA)
         
-        return fade_db_per_km * effective_path_km
+        return fade_db_per_km * RAIN_PATH_KM
     
-    def calculate_suitability_score(self, frequency_mhz: int, 
+    @classmethod
+    def calculate_suitability_score(cls, frequency_mhz: int, 
                                   dish_diameter_m: float,
                                   tree_loss_db: float) -> float:
         """Calculate overall suitability score (0-100)"""
         
-        band = self.BAND_CHARACTERISTICS[frequency_mhz]
+        band = cls._band(frequency_mhz)
         
         # Base score
         score = 100
@@ -260,15 +515,22 @@ class RFAnalyzer:
     def recommend_dish_size(self, frequency_mhz: int, 
                           target_gain_db: float = None) -> Dict:
         """Recommend optimal dish size for frequency"""
-        
-        band = self.BAND_CHARACTERISTICS[frequency_mhz]
+        # Cached like analyze_frequency_band; copy the result and its
+        # recommendation entries so callers can't modify the cached one
+        result = self._recommend_dish_size(frequency_mhz, target_gain_db)
+        return dict(result, recommendations=[dict(r) for r in result["recommendations"]])
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _recommend_dish_size(cls, frequency_mhz: int, target_gain_db: float) -> Dict:
+        band = cls._band(frequency_mhz)
         wavelength_m = band["wavelength_cm"] / 100
         
         recommendations = []
         
         for dish_size in band["typical_dish_sizes"]:
             efficiency = 0.6
-            gain_db = 10 * math.log10(efficiency * (math.pi * dish_size / wavelength_m) ** 2)
+            gain_db = 10 * _log10(efficiency * (_PI * dish_size / wavelength_m) ** 2)
             beamwidth_deg = 70 * wavelength_m / dish_size
             
             recommendations.append({
@@ -280,7 +542,7 @@ class RFAnalyzer:
         
         # Find optimal size
         if target_gain_db:
-            optimal_diameter = wavelength_m * math.sqrt(10 ** (target_gain_db / 10) / (efficiency * math.pi))
+            optimal_diameter = wavelength_m * _sqrt(10 ** (target_gain_db / 10) / (efficiency * _PI))
             optimal_diameter = round(optimal_diameter * 4) / 4  # Round to nearest 0.25m
         else:
             optimal_diameter = band["typical_dish_sizes"][1]  # Second option usually good compromise
@@ -298,17 +560,17 @@ class RFAnalyzer:
                             elevation_deg: float = 15) -> Dict:
         """Calculate EME link budget"""
         
-        analysis = self.analyze_frequency_band(frequency_mhz, dish_diameter_m)
+        band = self._band(frequency_mhz)
         
         # Transmit power
-        tx_power_dbw = 10 * math.log10(tx_power_w)
+        tx_power_dbw = 10 * _log10(tx_power_w)
         
         # Antenna gains (assume same dish for TX and RX)
-        tx_gain_db = analysis["antenna_gain_db"]
-        rx_gain_db = analysis["antenna_gain_db"]
+        tx_gain_db = self._antenna_gain_db(band["wavelength_cm"] / 100, dish_diameter_m)
+        rx_gain_db = tx_gain_db
         
         # Path loss
-        path_loss_db = analysis["path_loss_db"]
+        path_loss_db = self._eme_path_loss_db(frequency_mhz)
         
         # Additional losses
         misc_losses_db = 3  # Feedline, mismatch, etc.
@@ -324,8 +586,7 @@ class RFAnalyzer:
                         path_loss_db - misc_losses_db - elevation_loss_db)
         
         # Noise floor
-        bandwidth_hz = 2500  # Typical SSB bandwidth
-        noise_floor_dbw = 10 * math.log10(1.38e-23 * analysis["system_noise_k"] * bandwidth_hz)
+        noise_floor_dbw = self._noise_floor_dbw(frequency_mhz)
         
         # Signal-to-noise ratio
         snr_db = rx_signal_dbw - noise_floor_dbw